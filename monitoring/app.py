@@ -1,97 +1,218 @@
 import streamlit as st
 import oracledb
 import os
+import socket
+import time
+from collections import deque
 import docker
+from dataclasses import dataclass, field
+import pyarrow as pa
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 
 st.set_page_config(page_title="Oracle DB Monitor", page_icon="📊", layout="wide")
 
-# Initialize Docker Client
-try:
-    docker_client = docker.from_env()
-except Exception as e:
-    docker_client = None
-    print(f"Docker socket error: {e}")
+# Driver-wide default: fetch LOBs inline as str/bytes (fetch sizes are set per cursor)
+oracledb.defaults.fetch_lobs = False
 
 # --- Configuration ---
-DB1_CONTAINER = os.getenv('DB1_CONTAINER_NAME', 'oracle-db1')
-DB1_NAME = os.getenv('DB1_NAME', 'Database 1')
-DB1_CONFIG = {
-    "host": os.getenv('DB1_HOST', 'oracle-db1'),
-    "port": os.getenv('DB1_PORT', '1521'),
-    "sid": os.getenv('DB1_SID', 'ORCLCDB1'),
-    "pdb": os.getenv('DB1_PDB', 'ORCLPDB1'),
-    "user": os.getenv('DB1_USER', 'SYS'),
-    "pwd": os.getenv('DB1_PWD', 'Welcome123456')
-}
-
-DB2_CONTAINER = os.getenv('DB2_CONTAINER_NAME', 'oracle-db2')
-DB2_NAME = os.getenv('DB2_NAME', 'Database 2')
-DB2_CONFIG = {
-    "host": os.getenv('DB2_HOST', 'oracle-db2'),
-    "port": os.getenv('DB2_PORT', '1521'),
-    "sid": os.getenv('DB2_SID', 'ORCLCDB2'),
-    "pdb": os.getenv('DB2_PDB', 'ORCLPDB2'),
-    "user": os.getenv('DB2_USER', 'SYS'),
-    "pwd": os.getenv('DB2_PWD', 'Welcome123456')
-}
+@dataclass(frozen=True, slots=True)
+class DbConfig:
+    name: str
+    container: str
+    host: str
+    port: str
+    sid: str
+    pdb: str
+    user: str
+    pwd: str = field(repr=False)
+    dsn: str | None
+    info_md: str
+
+def _info_markdown(host, port, pdb, sid):
+    return (f"**Connection String:** `{host}:{port}/{pdb}`\n\n"
+            f"**SID:** `{sid}`")
+
+def _make_dsn(host, port, pdb):
+    # A bad port must not crash the page at load time; callers report it per panel instead
+    try:
+        return oracledb.makedsn(host, int(port), service_name=pdb)
+    except ValueError:
+        return None
+
+@st.cache_resource
+def _cfg(prefix, name, container, host, sid, pdb):
+    # Read once per server process; the script body re-executes on every rerun.
+    # Arguments after the prefix are the defaults used when the env var is unset.
+    host = os.getenv(f'{prefix}_HOST', host)
+    port = os.getenv(f'{prefix}_PORT', '1521')
+    pdb = os.getenv(f'{prefix}_PDB', pdb)
+    sid = os.getenv(f'{prefix}_SID', sid)
+    return DbConfig(
+        name=os.getenv(f'{prefix}_NAME', name),
+        container=os.getenv(f'{prefix}_CONTAINER_NAME', container),
+        host=host,
+        port=port,
+        sid=sid,
+        pdb=pdb,
+        user=os.getenv(f'{prefix}_USER', 'SYS'),
+        pwd=os.getenv(f'{prefix}_PWD', 'Welcome123456'),
+        dsn=_make_dsn(host, port, pdb),
+        info_md=_info_markdown(host, port, pdb, sid),
+    )
+
+DB1_CONFIG = _cfg('DB1', name='Database 1', container='oracle-db1',
+                  host='oracle-db1', sid='ORCLCDB1', pdb='ORCLPDB1')
+DB2_CONFIG = _cfg('DB2', name='Database 2', container='oracle-db2',
+                  host='oracle-db2', sid='ORCLCDB2', pdb='ORCLPDB2')
+
+LOG_TAIL_LINES = 50
+LOG_MAX_BYTES = 65536
+LOG_REFRESH_DEBOUNCE_S = 1.0
+MAX_DISPLAY_ROWS = 5000
+CONNECT_TIMEOUT_S = 2
+CALL_TIMEOUT_MS = 5000
+POOL_WAIT_TIMEOUT_MS = 3000
+# Upper bound on waiting for a status probe: TCP check + pool wait + call timeout, plus slack
+PROBE_TIMEOUT_S = 10
+
+# Fixed statement text so the session statement cache can reuse the parsed cursor.
+# Single round-trip for instance info and session count.
+_Q_STATUS = ("SELECT i.VERSION, i.INSTANCE_NAME, i.STATUS, i.DATABASE_STATUS, "
+             "(SELECT COUNT(*) FROM V$SESSION) FROM V$INSTANCE i")
 
 # --- Helper Functions ---
+@st.cache_resource
+def get_pool(dsn, user, _pwd):
+    # Long-lived SYSDBA pool for the status probe, shared across reruns; password is excluded from the cache key
+    return _create_pool(dsn, user, _pwd, min=1, max=4, stmtcachesize=40)
+
+@st.cache_resource
+def get_query_pool(dsn, user, _pwd):
+    # Ad-hoc SQL only; sessions are dropped after each query, so this just bounds the connect wait
+    return _create_pool(dsn, user, _pwd, min=0, max=2)
+
+def _create_pool(dsn, user, pwd, **kwargs):
+    # tcp_connect_timeout only covers the TCP connect; TIMEDWAIT also bounds a listener that
+    # accepts but never finishes the handshake (e.g. a paused container)
+    return oracledb.create_pool(user=user, password=pwd, dsn=dsn, mode=oracledb.SYSDBA,
+                                increment=1, homogeneous=True, tcp_connect_timeout=CONNECT_TIMEOUT_S,
+                                getmode=oracledb.POOL_GETMODE_TIMEDWAIT, wait_timeout=POOL_WAIT_TIMEOUT_MS,
+                                **kwargs)
+
+@st.cache_resource
+def get_executor():
+    # Worker threads live as long as the pools, so both probes dispatch onto warm threads and sessions
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="db-probe")
+
+@st.cache_resource
+def get_docker_client():
+    # Created once per server process; failures are not cached so the next rerun retries
+    return docker.from_env()
+
+@st.cache_data(ttl=3, show_spinner=False)
 def get_container_logs(container_name):
-    if not docker_client:
+    try:
+        docker_client = get_docker_client()
+    except Exception as e:
+        print(f"Docker socket error: {e}")
         return "Docker socket not connected. Cannot fetch logs."
     try:
         container = docker_client.containers.get(container_name)
-        # Fetch last 50 lines
-        return container.logs(tail=150).decode('utf-8')
+        # Stream the last LOG_TAIL_LINES lines, keeping only the newest LOG_MAX_BYTES
+        stream = container.logs(tail=LOG_TAIL_LINES, stream=True, follow=False)
+        chunks = deque()
+        total = 0
+        try:
+            for chunk in stream:
+                chunks.append(chunk)
+                total += len(chunk)
+                while total - len(chunks[0]) >= LOG_MAX_BYTES:
+                    total -= len(chunks.popleft())
+        finally:
+            stream.close()
+        return b"".join(chunks)[-LOG_MAX_BYTES:].decode('utf-8', errors='replace')
     except Exception as e:
         return f"Error reading logs for {container_name}: {str(e)}"
 
+def _to_arrow_array(values):
+    try:
+        return pa.array(values)
+    except (pa.ArrowException, OverflowError):
+        # Mixed, driver-specific or out-of-range (e.g. ints beyond int64) values: fall back to their string form
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+def _to_arrow(columns, rows):
+    # Transpose rows into columns so st.dataframe gets Arrow directly, with no pandas inference pass
+    values = list(zip(*rows)) if rows else [()] * len(columns)
+    return pa.table([_to_arrow_array(list(v)) for v in values], names=columns)
+
 def execute_query(config, query):
-    dsn = f"{config['host']}:{config['port']}/{config['pdb']}"
+    if config.dsn is None:
+        return {"success": False, "error": f"Invalid port: {config.port!r}"}
     try:
-        conn = oracledb.connect(user=config['user'], password=config['pwd'], dsn=dsn, mode=oracledb.SYSDBA)
-        cursor = conn.cursor()
-        cursor.execute(query)
-        
-        if cursor.description:
-            columns = [col[0] for col in cursor.description]
-            data = cursor.fetchall()
-            # Convert to list of dicts for nicer display without pandas
-            result = [dict(zip(columns, row)) for row in data]
-            conn.close()
-            return {"success": True, "data": result}
-        else:
-            conn.commit()
-            conn.close()
-            return {"success": True, "message": "Statement executed successfully (No Output)."}
+        # Ad-hoc SQL gets its own session, dropped afterwards, so session-level changes
+        # (ALTER SESSION SET CONTAINER / CURRENT_SCHEMA / NLS) never leak into later queries
+        pool = get_query_pool(config.dsn, config.user, config.pwd)
+        conn = pool.acquire()
+        try:
+            conn.call_timeout = CALL_TIMEOUT_MS
+            cursor = conn.cursor()
+            # Larger fetch batches mean fewer round-trips for multi-row results
+            cursor.arraysize = 1000
+            cursor.prefetchrows = 1001
+            cursor.execute(query)
+            
+            if cursor.description:
+                columns = [col[0] for col in cursor.description]
+                # Fetch one extra row to detect whether the result was cut off
+                rows = cursor.fetchmany(MAX_DISPLAY_ROWS + 1)
+                truncated = len(rows) > MAX_DISPLAY_ROWS
+                return {"success": True, "data": _to_arrow(columns, rows[:MAX_DISPLAY_ROWS]), "truncated": truncated}
+            else:
+                conn.commit()
+                return {"success": True, "message": "Statement executed successfully (No Output)."}
+        finally:
+            pool.drop(conn)
             
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-def check_connection(config):
-    dsn = f"{config['host']}:{config['port']}/{config['pdb']}"
+def _port_open(host, port, timeout=0.5):
+    try:
+        with socket.create_connection((host, int(port)), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _cached_status(host, port, dsn, user, _pwd):
+    # Keyed on (host, port, dsn, user) only; reruns within the TTL share one probe
+    offline = {"status": "Initializing / Offline", "color": "orange"}
+    if dsn is None:
+        return {**offline, "error": f"Invalid port: {port!r}"}
+    # Cheap TCP check first so a listener that is not up yet fails fast
+    if not _port_open(host, port):
+        return {**offline, "error": f"Listener not reachable at {host}:{port}"}
     try:
-        conn = oracledb.connect(user=config['user'], password=config['pwd'], dsn=dsn, mode=oracledb.SYSDBA)
-        cursor = conn.cursor()
-        cursor.execute("SELECT VERSION, INSTANCE_NAME, STATUS, DATABASE_STATUS FROM V$INSTANCE")
-        version, instance, status, db_status = cursor.fetchone()
-        cursor.execute("SELECT COUNT(*) FROM V$SESSION")
-        session_count = cursor.fetchone()[0]
-        conn.close()
+        with get_pool(dsn, user, _pwd).acquire() as conn:
+            conn.call_timeout = CALL_TIMEOUT_MS
+            cursor = conn.cursor()
+            # One-row result: fetch it with the execute round-trip
+            cursor.prefetchrows = 2
+            cursor.execute(_Q_STATUS)
+            version, instance, status, db_status, session_count = cursor.fetchone()
         return {
             "status": "Online", "color": "green",
             "details": {"Version": version, "Instance": instance, "Mode": f"{status} / {db_status}", "Sessions": session_count}
         }
     except Exception as e:
-        return {"status": "Initializing / Offline", "color": "orange", "error": str(e)}
+        return {**offline, "error": str(e)}
 
-def display_db_panel(name, config, container_name, db_key):
-    st.header(f"{name}")
-    
-    tab_status, tab_logs, tab_query, tab_info = st.tabs(["🚦 Status", "📜 Live Logs", "🔍 Query", "ℹ️ Info"])
-    
-    with tab_status:
-        result = check_connection(config)
+def check_connection(config):
+    return _cached_status(config.host, config.port, config.dsn, config.user, config.pwd)
+
+def render_status(slot, result):
+    with slot.container():
         if result["status"] == "Online":
             st.success(f"Status: {result['status']} 🟢")
             col1, col2, col3 = st.columns(3)
@@ -104,11 +225,32 @@ def display_db_panel(name, config, container_name, db_key):
             with st.expander("Show Connection Error"):
                 st.code(result.get("error", "Unknown"), language="text")
 
+def display_db_panel(name, config, container_name, db_key):
+    st.header(f"{name}")
+    
+    tab_status, tab_logs, tab_query, tab_info = st.tabs(["🚦 Status", "📜 Live Logs", "🔍 Query", "ℹ️ Info"])
+    
+    with tab_status:
+        # Cleared in the callback, before the click's rerun submits the probes
+        st.button("Force refresh", key=f"refresh_{db_key}", on_click=_cached_status.clear)
+        # Show the last known status right away; the caller fills in the fresh one
+        status_slot = st.empty()
+        last = st.session_state.get(f"last_{db_key}")
+        if last:
+            render_status(status_slot, last)
+        else:
+            status_slot.info("Checking status...")
+
     with tab_logs:
         if st.button(f"Refresh Logs {name}", key=f"btn_{db_key}"):
-            st.rerun()
+            # The click already reruns the script; just drop cached logs, at most once per debounce window
+            now = time.monotonic()
+            refresh_key = f"_last_refresh_{db_key}"
+            if now - st.session_state.get(refresh_key, 0) > LOG_REFRESH_DEBOUNCE_S:
+                st.session_state[refresh_key] = now
+                get_container_logs.clear()
         logs = get_container_logs(container_name)
-        st.code(logs, language="bash")
+        st.text(logs)
 
     with tab_query:
         st.caption(f"Run SQL on **{name}** (as SYSDBA)")
@@ -131,7 +273,9 @@ def display_db_panel(name, config, container_name, db_key):
             res = st.session_state[result_key]
             if res["success"]:
                 if "data" in res:
-                    st.write(f"**Results ({len(res['data'])} rows):**")
+                    st.write(f"**Results ({res['data'].num_rows} rows):**")
+                    if res.get("truncated"):
+                        st.warning(f"Result truncated to the first {MAX_DISPLAY_ROWS} rows.")
                     st.dataframe(res["data"])
                 else:
                     st.success(res["message"])
@@ -139,22 +283,46 @@ def display_db_panel(name, config, container_name, db_key):
                 st.error(f"Error: {res['error']}")
 
     with tab_info:
-        st.markdown(f"**Connection String:** `{config['host']}:{config['port']}/{config['pdb']}`")
-        st.markdown(f"**SID:** `{config['sid']}`")
+        st.markdown(config.info_md)
+
+    return status_slot
 
 # --- Main UI ---
 st.title("📊 Oracle Database Setup Monitor")
 
+# Probe both databases concurrently; the Oracle driver releases the GIL while waiting on the network
+executor = get_executor()
+db1_future = executor.submit(check_connection, DB1_CONFIG)
+db2_future = executor.submit(check_connection, DB2_CONFIG)
+
 col1, col2 = st.columns(2)
+panels = [
+    (col1, DB1_CONFIG, "DB1", db1_future),
+    (col2, DB2_CONFIG, "DB2", db2_future),
+]
 
-with col1:
-    try:
-        display_db_panel(DB1_NAME, DB1_CONFIG, DB1_CONTAINER, "DB1")
-    except Exception as e:
-        st.error(f"Error loading DB1 Panel: {e}")
+# Paint both panels from last-known state first, then swap in the fresh probe results
+slots = {}
+for col, config, db_key, _ in panels:
+    with col:
+        try:
+            slots[db_key] = display_db_panel(config.name, config, config.container, db_key)
+        except Exception as e:
+            st.error(f"Error loading {db_key} Panel: {e}")
 
-with col2:
-    try:
-        display_db_panel(DB2_NAME, DB2_CONFIG, DB2_CONTAINER, "DB2")
-    except Exception as e:
-        st.error(f"Error loading DB2 Panel: {e}")
+for col, _, db_key, future in panels:
+    if db_key not in slots:
+        continue
+    with col:
+        try:
+            try:
+                result = future.result(timeout=PROBE_TIMEOUT_S)
+            except FuturesTimeoutError:
+                # Don't hold the page on a wedged probe; drop it if it never got a worker
+                future.cancel()
+                result = {"status": "Initializing / Offline", "color": "orange",
+                          "error": f"Status probe timed out after {PROBE_TIMEOUT_S}s"}
+            st.session_state[f"last_{db_key}"] = result
+            render_status(slots[db_key], result)
+        except Exception as e:
+            st.error(f"Error loading {db_key} Panel: {e}")